@@ -0,0 +1,57 @@
+"""Startup benchmark.
+
+Measures the wall-clock time of a fresh interpreter importing each target
+module, which is what a worker, CLI run or test process pays on cold start.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [module ...]
+
+Defaults to comparing the bare interpreter, the core package and the
+Streamlit front end.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["", "fabs", "main"]
+
+
+def time_import(module, runs):
+    """Returns per-run durations (seconds) for importing module in a new interpreter."""
+    code = f"import {module}" if module else "pass"
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+        durations.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            # A child killed by a signal may write nothing to stderr; report its return code instead
+            stderr_lines = result.stderr.strip().splitlines()
+            reason = stderr_lines[-1] if stderr_lines else f"exit code {result.returncode}"
+            raise RuntimeError(f"Importing {module!r} failed: {reason}")
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time.")
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter launches per module")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    args = parser.parse_args()
+
+    print(f"{'module':<12} {'median ms':>10} {'min ms':>10}")
+    for module in args.modules:
+        label = module or "(python)"
+        try:
+            durations = time_import(module, args.runs)
+        except RuntimeError as e:
+            print(f"{label:<12} skipped: {e}")
+            continue
+        print(f"{label:<12} {statistics.median(durations) * 1000:>10.1f} {min(durations) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
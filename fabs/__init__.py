@@ -0,0 +1,45 @@
+"""FABS - Flutter App Builder with Swarm.
+
+Importing this package is cheap: only the standard library is loaded up front.
+The Streamlit front end lives in main.py.
+"""
+from .core import (
+    CACHE_DIR,
+    CACHE_EXPIRATION,
+    GENERATED_FILES,
+    OPENAI_REQUEST_TIMEOUT,
+    PROCESS_TIMEOUT,
+    create_zip_file,
+    generate_all_code,
+    generate_authentication_code,
+    generate_database_code,
+    generate_flutter_app_code,
+    generate_flutter_project_structure,
+    generate_networking_code,
+    generate_screens_and_widgets,
+    get_cache_key,
+    get_cached_result,
+    get_openai_client,
+    initialize_git_repo,
+    load_config,
+    review_all_code,
+    review_and_debug_code,
+    save_config,
+    save_to_cache,
+    setup_swarm,
+    validate_app_name,
+    write_project_files,
+)
+from .pubspec import (
+    COMMON_PACKAGES,
+    PUB_CACHE_DIR,
+    resolve_dependencies,
+    scan_package_imports,
+    sync_pubspec_dependencies,
+    update_pubspec,
+    warm_pub_cache,
+)
+from .workspace import (
+    WorkspaceManager,
+    get_workspace_manager,
+)
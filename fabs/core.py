@@ -0,0 +1,454 @@
+"""Flutter app generation pipeline.
+
+This module has no Streamlit dependency and only imports the standard library
+at load time. Heavy dependencies (openai, swarm) are imported on first use so
+workers, CLI runs and tests start quickly.
+"""
+import re
+import subprocess
+import logging
+import zipfile
+import io
+import json
+import os
+import hashlib
+import pickle
+import threading
+import time
+from functools import lru_cache
+
+
+# Configuration and constants
+CACHE_DIR = "flutter_app_cache"
+CACHE_EXPIRATION = 24 * 60 * 60
+OPENAI_REQUEST_TIMEOUT = 60  # Timeout for OpenAI requests
+PROCESS_TIMEOUT = 180        # Timeout for subprocess calls
+
+# Generated source files, in the order they are produced and written to lib/
+GENERATED_FILES = [
+    "main.dart",
+    "screens_widgets.dart",
+    "networking.dart",
+    "database.dart",
+    "authentication.dart",
+]
+
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    """Returns the shared OpenAI client, creating it on first use."""
+    import openai
+    return openai.OpenAI()
+
+def get_cache_key(instructions, mode, state_management, target_platform, database_type):
+    key = f"{instructions}|{mode}|{state_management}|{','.join(sorted(target_platform))}|{database_type}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+def get_cached_result(cache_key):
+    cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
+    if os.path.exists(cache_file):
+        file_age = time.time() - os.path.getmtime(cache_file)
+        if file_age < CACHE_EXPIRATION:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        else:
+            os.remove(cache_file)
+            logging.info(f"Removed expired cache file: {cache_file}")
+    return None
+
+def save_to_cache(cache_key, result):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
+        # Write to a temporary file first so concurrent builds never read a partial pickle
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump(result, f)
+        os.replace(tmp_file, cache_file)
+        logging.info(f"Saved result to cache: {cache_file}")
+    except Exception as e:
+        logging.error(f"Error saving to cache: {str(e)}")
+
+def load_config():
+    try:
+        if os.path.exists("config.json"):
+            with open("config.json", "r") as f:
+                return json.load(f)
+    except Exception as e:
+        logging.error(f"Error loading config: {str(e)}")
+    return {
+        "openai_api_key": "",
+        "output_folder": "generated_flutter_apps",
+        "git_repo_url": "",
+        "flutter_sdk_path": "C:/flutter/",
+        "workspace_root": "flutter_workspaces",
+        "workspace_quota": 5 * 1024 * 1024 * 1024,
+        "use_tmpfs": False,
+        "prompts": {
+            "Full-Stack Developer": "You are a Full-Stack Developer. Create a Flutter app with both frontend and backend integration based on the following instructions:",
+            "UI Designer": "You are a UI Designer. Create a Flutter app with a beautiful and intuitive user interface based on the following instructions:",
+            "Mobile App Specialist": "You are a Mobile App Specialist. Create a Flutter app optimized for mobile devices with the following features:"
+        }
+    }
+
+# Save configuration
+def save_config(config):
+    try:
+        with open("config.json", "w") as f:
+            json.dump(config, f, indent=2)
+        logging.info("Config saved successfully")
+    except Exception as e:
+        logging.error(f"Error saving config: {str(e)}")
+
+def validate_app_name(app_name):
+    """Validates the app name using a regular expression."""
+    if not re.match(r"^[a-z_]+$", app_name):
+        raise ValueError("Invalid app name. Use lowercase letters and underscores only.")
+    return app_name
+
+def generate_flutter_project_structure(app_name, target_platform, flutter_sdk_path, workspace_dir):
+    """Generates the Flutter project structure inside workspace_dir."""
+    try:
+        create_command = [
+            os.path.join(flutter_sdk_path, "bin", "flutter"),
+            "create",
+            # Dependencies are resolved offline later by fabs.pubspec, never online here
+            "--no-pub",
+            f"--platforms={target_platform}",
+            app_name
+        ]
+        subprocess.run(create_command, cwd=workspace_dir, check=True, timeout=PROCESS_TIMEOUT)
+        return os.path.join(workspace_dir, app_name)
+    except subprocess.TimeoutExpired as e:
+        logging.error(f"Timeout creating Flutter project: {str(e)}")
+        raise TimeoutError(f"Flutter project creation timed out after {PROCESS_TIMEOUT} seconds.") from e
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Error creating Flutter project: {str(e)}, Output: {e.stderr.decode()}")
+        raise RuntimeError(f"Error creating Flutter project: {e.stderr.decode()}") from e
+    except Exception as e:
+        logging.exception(f"Unexpected error creating Flutter project: {str(e)}")
+        raise
+
+def generate_flutter_app_code(instructions, mode, state_management, config):
+    import openai
+    try:
+        openai.api_key = config["openai_api_key"]
+        prompt = (
+            f"{config['prompts'][mode]}\n\n"
+            f"Instructions:\n{instructions}\n\n"
+            f"Requirements:\n"
+            f"- Use {state_management} for state management.\n"
+            f"- Follow Material Design 3 guidelines and best practices.\n"
+            f"- Utilize Material Design 3 widgets.\n"
+            f"- Ensure the code is modular and follows best practices.\n"
+            f"- Include comments and documentation for clarity.\n"
+            f"- Adhere to the latest Flutter guidelines.\n\n"
+            f"Provide the complete content for the main.dart file."
+        )
+        response = get_openai_client().chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a helpful AI assistant that generates Flutter app code."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=4000,
+            n=1,
+            stop=None,
+            temperature=0.7,
+        )
+        return response.choices[0].message.content
+    except openai.error.Timeout as e:
+        logging.error(f"OpenAI API request timed out: {str(e)}")
+        raise TimeoutError("The request to OpenAI timed out. Please try again later.") from e
+    except Exception as e:
+        logging.exception(f"Error generating Flutter app code: {str(e)}")
+        raise
+
+def generate_screens_and_widgets(instructions, app_name):
+    import openai
+    try:
+        prompt = (
+            f"Generate comprehensive Flutter code for additional screens and widgets for the app '{app_name}' based on these instructions:\n\n"
+            f"{instructions}\n\n"
+            f"Requirements:\n"
+            f"- Follow Material Design 3 guidelines and best practices.\n"
+            f"- Utilize Material Design 3 widgets.\n"
+            f"- Include navigation, state management, and UI components.\n"
+            f"- Ensure the code is modular and follows best practices.\n"
+            f"- Adhere to the latest Flutter guidelines."
+        )
+        response = get_openai_client().chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a helpful AI assistant that generates perfect Flutter app code."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=2000,
+            n=1,
+            stop=None,
+            temperature=0.7,
+        )
+        # Accessing 'content' from the correct location in the response
+        return response.choices[0].message.content
+    except openai.error.Timeout as e:
+        logging.error(f"OpenAI API request timed out: {str(e)}")
+        raise TimeoutError("The request to OpenAI timed out. Please try again later.") from e
+    except Exception as e:
+        logging.error(f"Error generating screens and widgets code: {str(e)}")
+        raise
+
+def generate_networking_code(instructions, app_name):
+    import openai
+    prompt = (
+        f"Generate comprehensive Flutter networking code for the app '{app_name}' based on these instructions:\n\n"
+        f"{instructions}\n\n"
+        f"Requirements:\n"
+        f"- Follow Material Design 3 guidelines and best practices.\n"
+        f"- Utilize Material Design 3 widgets where applicable.\n"
+        f"- Include API client setup, HTTP request handling, error handling, and best practices for performance and security.\n"
+        f"- Ensure the code is modular and follows the latest Flutter guidelines."
+    )
+    response = get_openai_client().chat.completions.create(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are a helpful AI assistant that generates perfect Flutter app code."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=2000,
+        n=1,
+        stop=None,
+        temperature=0.7,
+    )
+    try:
+        # Accessing 'content' from the correct location in the response
+        return response.choices[0].message.content
+    except openai.error.Timeout as e:
+        logging.error(f"OpenAI API request timed out: {str(e)}")
+        raise TimeoutError("The request to OpenAI timed out. Please try again later.") from e
+    except Exception as e:
+        logging.error(f"Error accessing content from response: {str(e)}")
+        raise
+
+def generate_database_code(instructions, app_name, database_type):
+    import openai
+    prompt = (
+        f"Generate Flutter database code for the app '{app_name}' using {database_type} based on these instructions:\n\n"
+        f"{instructions}\n\n"
+        f"Requirements:\n"
+        f"- Follow Material Design 3 guidelines and best practices.\n"
+        f"- Utilize Material Design 3 widgets where applicable.\n"
+        f"- Include setup, CRUD operations, and best practices for data handling and security.\n"
+        f"- Ensure the code is optimized for performance and follows the latest Flutter and {database_type} guidelines."
+    )
+    response = get_openai_client().chat.completions.create(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are a helpful AI assistant that generates perfect Flutter app code."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=2000,
+        n=1,
+        stop=None,
+        temperature=0.7,
+    )
+    try:
+        # Accessing 'content' from the correct location in the response
+        return response.choices[0].message.content
+    except openai.error.Timeout as e:
+        logging.error(f"OpenAI API request timed out: {str(e)}")
+        raise TimeoutError("The request to OpenAI timed out. Please try again later.") from e
+    except Exception as e:
+        logging.error(f"Error accessing content from response: {str(e)}")
+        raise
+
+def generate_authentication_code(instructions, app_name):
+    import openai
+    prompt = (
+        f"Generate Flutter authentication code for the app '{app_name}' based on these instructions:\n\n"
+        f"{instructions}\n\n"
+        f"Requirements:\n"
+        f"- Follow Material Design 3 guidelines and best practices.\n"
+        f"- Utilize Material Design 3 widgets where applicable.\n"
+        f"- Include user registration, login, and logout functionalities.\n"
+        f"- Ensure the code is secure and follows best practices for handling user credentials and authentication tokens."
+    )
+    response = get_openai_client().chat.completions.create(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are a helpful AI assistant that generates perfect Flutter app code."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=2000,
+        n=1,
+        stop=None,
+        temperature=0.7,
+    )
+    try:
+        # Accessing 'content' from the correct location in the response
+        return response.choices[0].message.content
+    except openai.error.Timeout as e:
+        logging.error(f"OpenAI API request timed out: {str(e)}")
+        raise TimeoutError("The request to OpenAI timed out. Please try again later.") from e
+    except Exception as e:
+        logging.error(f"Error accessing content from response: {str(e)}")
+        raise
+
+def generate_all_code(instructions, mode, state_management, target_platform, database_type, app_name, config):
+    """Generates the content of every file in GENERATED_FILES, using the cache when possible.
+
+    Returns a tuple of (contents, from_cache) where contents is ordered like GENERATED_FILES.
+    """
+    cache_key = get_cache_key(instructions, mode, state_management, target_platform, database_type)
+    cached_result = get_cached_result(cache_key)
+    if cached_result:
+        return cached_result, True
+
+    from tqdm import tqdm
+
+    # Use tqdm for progress bars during code generation
+    with tqdm(total=5, desc="Generating Code", bar_format="{l_bar}{bar} [Time remaining: {remaining}]") as pbar:
+        main_dart_content = generate_flutter_app_code(instructions, mode, state_management, config)
+        pbar.update(1)
+        screens_widgets_content = generate_screens_and_widgets(instructions, app_name)
+        pbar.update(1)
+        networking_content = generate_networking_code(instructions, app_name)
+        pbar.update(1)
+        database_content = generate_database_code(instructions, app_name, database_type) if database_type != 'None' else ''
+        pbar.update(1)
+        auth_content = generate_authentication_code(instructions, app_name)
+        pbar.update(1)
+
+    result = (main_dart_content, screens_widgets_content, networking_content, database_content, auth_content)
+    save_to_cache(cache_key, result)
+    return result, False
+
+def write_project_files(project_path, files):
+    """Writes (file_name, content) pairs into the project's lib/ directory."""
+    for file_name, content in files:
+        with open(os.path.join(project_path, "lib", file_name), "w") as f:
+            f.write(content)
+
+# Create zip file
+def create_zip_file(project_path):
+    try:
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for root, dirs, files in os.walk(project_path):
+                # .dart_tool holds paths into this machine's pub cache; pub regenerates it from pubspec.lock
+                dirs[:] = [d for d in dirs if d != ".dart_tool"]
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    arcname = os.path.relpath(file_path, project_path)
+                    zip_file.write(file_path, arcname)
+        return zip_buffer.getvalue()
+    except Exception as e:
+        logging.error(f"Error creating zip file: {str(e)}")
+        raise
+
+# Initialize Git repository
+def initialize_git_repo(project_path: str, git_repo_url: str) -> None:
+    """Initializes a Git repository and pushes it to git_repo_url.
+
+    Failures are logged and re-raised so the caller can decide how to report them.
+    """
+    try:
+        commands = [
+            ["git", "init"],
+            ["git", "add", "."],
+            ["git", "commit", "-m", "Initial commit"],
+            ["git", "branch", "-M", "main"],
+            ["git", "remote", "add", "origin", git_repo_url],
+            ["git", "push", "-u", "origin", "main"]
+        ]
+
+        for cmd in commands:
+            result = subprocess.run(cmd, cwd=project_path, capture_output=True, text=True)
+            if result.returncode != 0:
+                logging.error(f"Command {cmd} failed: {result.stderr}")
+                raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+
+        logging.info(f"Git repository initialized and pushed to {git_repo_url}")
+    except subprocess.CalledProcessError as e:
+        # Log the specific Git error for debugging
+        logging.error(f"Git command failed: {e.cmd}, Return code: {e.returncode}, "
+                      f"Output: {e.stdout}, Error: {e.stderr}")
+        raise
+    except Exception as e:
+        logging.exception(f"Unexpected error during Git initialization: {str(e)}")
+        raise
+
+# Define Swarm Agents for Code Review and Debugging
+def setup_swarm():
+    from swarm import Swarm, Agent
+
+    # Initialize Swarm without agents
+    swarm = Swarm()
+
+    # Define Code Review Agent with enhanced prompt
+    code_review_agent = Agent(
+        name="CodeReviewAgent",
+        instructions=(
+            "You are an expert code reviewer with extensive experience in Flutter development. "
+            "Analyze the provided Flutter code thoroughly and suggest improvements. "
+            "Your review should include clear explanations of the code, suggestions for enhancements,and best practices for Flutter development. "
+            "Your review should cover code quality, adherence to best practices, performance optimization, "
+            "readability, maintainability, and potential bugs. Provide detailed feedback and actionable suggestions."
+        )
+    )
+
+    # Define Debugging Agent with enhanced prompt
+    debugging_agent = Agent(
+        name="DebuggingAgent",
+        instructions=(
+            "You are a skilled debugger with deep knowledge of Flutter and Dart. "
+            "Identify and fix any issues in the provided Flutter code. "
+            "Your debugging process should involve thorough analysis of the code,identification of logical errors, runtime issues, and potential crashes.  "
+            "Your debugging should include finding logical errors, runtime issues, and potential crashes. "
+            "Ensure the code is robust, efficient, and follows best practices. Provide detailed explanations of the fixes."
+        )
+    )
+
+    return swarm, code_review_agent, debugging_agent
+
+# Review and debug code using Swarm agents
+def review_and_debug_code(swarm, code_review_agent, debugging_agent, code_content, filename):
+    # Review Phase
+    review_prompt = (
+        f"Please review the following code in {filename} and suggest improvements. "
+        f"Ensure that any placeholder or TODO functions are fully implemented:\n\n{code_content}"
+    )
+    review_response = swarm.run(agent=code_review_agent, messages=[{"role": "user", "content": review_prompt}])
+    if not review_response.messages:
+        logging.error(f"No response received from CodeReviewAgent for {filename}.")
+        return code_content  # Return original if no response
+
+    review_suggestion = review_response.messages[-1].content
+    logging.info(f"Code review for {filename}: {review_suggestion}")
+
+    # Debugging Phase
+    debug_prompt = (
+        f"Based on the following review, please debug the code in {filename}. "
+        f"Ensure that any placeholder or TODO functions are fully implemented:\n\n"
+        f"Review Feedback:\n{review_suggestion}\n\nCode:\n{code_content}"
+    )
+    debug_response = swarm.run(agent=debugging_agent, messages=[{"role": "user", "content": debug_prompt}])
+    if not debug_response.messages:
+        logging.error(f"No response received from DebuggingAgent for {filename}.")
+        return review_suggestion  # Return review suggestion if no response
+
+    debug_suggestion = debug_response.messages[-1].content
+    logging.info(f"Debugging for {filename}: {debug_suggestion}")
+
+    return debug_suggestion
+
+def review_all_code(contents, swarm=None, code_review_agent=None, debugging_agent=None):
+    """Reviews and debugs each generated file, returning (file_name, content) pairs.
+
+    The Swarm agents are created on demand when not supplied.
+    """
+    if swarm is None:
+        swarm, code_review_agent, debugging_agent = setup_swarm()
+    return [
+        (file_name, review_and_debug_code(swarm, code_review_agent, debugging_agent, content, file_name))
+        for file_name, content in zip(GENERATED_FILES, contents)
+    ]
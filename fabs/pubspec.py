@@ -0,0 +1,256 @@
+"""Keeps a generated project's pubspec.yaml in sync with its Dart imports.
+
+Packages are resolved with `flutter pub get --offline` against a shared pub
+cache that is warmed ahead of time (see warm_pub_cache), so the build path
+never waits on the network. The pubspec.lock produced for each distinct
+dependency set is memoized and reused by later builds.
+"""
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from .core import PROCESS_TIMEOUT
+
+
+PUB_CACHE_DIR = os.path.abspath("flutter_pub_cache")
+LOCK_CACHE_DIR = os.path.join(PUB_CACHE_DIR, "locks")
+
+# Packages shipped with the Flutter SDK; these are never added as hosted dependencies
+SDK_PACKAGES = {"flutter", "flutter_test", "flutter_driver", "flutter_localizations", "flutter_web_plugins", "integration_test"}
+
+# Packages the generated code commonly imports, used to pre-warm the pub cache
+COMMON_PACKAGES = [
+    "provider",
+    "flutter_bloc",
+    "bloc",
+    "equatable",
+    "flutter_riverpod",
+    "riverpod",
+    "hive",
+    "hive_flutter",
+    "sqflite",
+    "path",
+    "path_provider",
+    "shared_preferences",
+    "http",
+    "firebase_core",
+    "firebase_auth",
+    "cloud_firestore",
+    "cupertino_icons",
+]
+
+PACKAGE_IMPORT_RE = re.compile(r"""^\s*(?:import|export)\s+['"]package:([a-z][a-z0-9_]*)/""", re.MULTILINE)
+DEPENDENCY_SECTIONS = ["dependencies", "dev_dependencies", "dependency_overrides"]
+DEPENDENCY_LINE_RE = re.compile(r"^  ([a-z][a-z0-9_]*)\s*:")
+
+
+def _pub_env():
+    env = os.environ.copy()
+    env["PUB_CACHE"] = PUB_CACHE_DIR
+    return env
+
+def _flutter(flutter_sdk_path):
+    return os.path.join(flutter_sdk_path, "bin", "flutter")
+
+def scan_package_imports(project_path, app_name):
+    """Returns the sorted hosted package names imported by the Dart files under lib/."""
+    packages = set()
+    for root, _, files in os.walk(os.path.join(project_path, "lib")):
+        for file in files:
+            if not file.endswith(".dart"):
+                continue
+            with open(os.path.join(root, file), "r", encoding="utf-8", errors="replace") as f:
+                packages.update(PACKAGE_IMPORT_RE.findall(f.read()))
+    packages -= SDK_PACKAGES
+    packages.discard(app_name)
+    return sorted(packages)
+
+def _find_section(lines, name):
+    """Returns the index of the top-level `name:` header line, or None."""
+    # Headers may carry trailing spaces or a comment, e.g. "dependencies:  # app packages"
+    header_re = re.compile(rf"^{name}:\s*(#.*)?$")
+    for index, line in enumerate(lines):
+        if header_re.match(line):
+            return index
+    return None
+
+def _section_bounds(lines, start):
+    """Returns (start, end) line indices of the section whose header is at start; end is exclusive."""
+    # The section ends at the next top-level key
+    end = start + 1
+    while end < len(lines) and (not lines[end] or lines[end][0] in " #"):
+        end += 1
+    return start, end
+
+def update_pubspec(project_path, packages, constraint="any"):
+    """Adds any of packages not yet declared in pubspec.yaml to its dependencies section.
+
+    The file is edited line by line so comments and formatting written by
+    `flutter create` are preserved. Returns the list of packages that were added.
+    """
+    pubspec_path = os.path.join(project_path, "pubspec.yaml")
+    with open(pubspec_path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    # Packages already declared anywhere (e.g. flutter_lints under dev_dependencies) are left alone
+    existing = set()
+    for section in DEPENDENCY_SECTIONS:
+        header = _find_section(lines, section)
+        if header is not None:
+            start, end = _section_bounds(lines, header)
+            existing.update(m.group(1) for m in map(DEPENDENCY_LINE_RE.match, lines[start + 1:end]) if m)
+    added = [package for package in packages if package not in existing]
+    if not added:
+        return added
+
+    header = _find_section(lines, "dependencies")
+    if header is None:
+        lines.append("dependencies:")
+        header = len(lines) - 1
+    start, end = _section_bounds(lines, header)
+
+    # Insert after the last non-blank line of the section
+    insert_at = end
+    while insert_at > start + 1 and not lines[insert_at - 1].strip():
+        insert_at -= 1
+    lines[insert_at:insert_at] = [f"  {package}: {constraint}" for package in added]
+
+    with open(pubspec_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    logging.info(f"Added dependencies to {pubspec_path}: {', '.join(added)}")
+    return added
+
+def _sdk_version(flutter_sdk_path):
+    # Read from the SDK's own version files; launching flutter just for this would be slow
+    for relative_path in ("version", os.path.join("bin", "cache", "flutter.version.json")):
+        try:
+            with open(os.path.join(flutter_sdk_path, relative_path), "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            continue
+    return ""
+
+def get_dependency_set_key(packages, flutter_sdk_path):
+    key = f"{flutter_sdk_path}|{_sdk_version(flutter_sdk_path)}|{','.join(sorted(packages))}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+def _offline_pub_get(project_path, flutter_sdk_path):
+    try:
+        subprocess.run([_flutter(flutter_sdk_path), "pub", "get", "--offline"], cwd=project_path, env=_pub_env(),
+                       check=True, capture_output=True, text=True, timeout=PROCESS_TIMEOUT)
+    except subprocess.TimeoutExpired as e:
+        logging.error(f"Timeout resolving dependencies: {str(e)}")
+        raise TimeoutError(f"Dependency resolution timed out after {PROCESS_TIMEOUT} seconds.") from e
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Offline dependency resolution failed: {e.stderr}")
+        raise RuntimeError(f"Offline dependency resolution failed: {e.stderr}") from e
+
+def resolve_dependencies(project_path, packages, flutter_sdk_path):
+    """Runs `flutter pub get --offline`, reusing the memoized lock file for this dependency set."""
+    lock_path = os.path.join(project_path, "pubspec.lock")
+    cached_lock = os.path.join(LOCK_CACHE_DIR, f"{get_dependency_set_key(packages, flutter_sdk_path)}.lock")
+    lock_hit = False
+    if os.path.exists(cached_lock):
+        try:
+            shutil.copyfile(cached_lock, lock_path)
+            lock_hit = True
+        except OSError as e:
+            logging.error(f"Error reusing memoized lock file: {str(e)}")
+
+    try:
+        _offline_pub_get(project_path, flutter_sdk_path)
+    except RuntimeError:
+        if not lock_hit:
+            raise
+        # The memoized lock no longer resolves (e.g. the pub cache was pruned), so
+        # drop it and resolve from scratch rather than failing every later build
+        logging.warning(f"Discarding memoized lock file that failed to resolve: {cached_lock}")
+        for path in (cached_lock, lock_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        lock_hit = False
+        _offline_pub_get(project_path, flutter_sdk_path)
+
+    if not lock_hit and os.path.exists(lock_path):
+        _memoize_lock(lock_path, cached_lock)
+
+def _memoize_lock(lock_path, cached_lock):
+    # A failure here only costs a cache entry, so it is logged and never fails the build
+    tmp_path = None
+    try:
+        os.makedirs(LOCK_CACHE_DIR, exist_ok=True)
+        # Write to a private temporary file first so concurrent builds never read a partial lock
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=LOCK_CACHE_DIR)
+        os.close(fd)
+        shutil.copyfile(lock_path, tmp_path)
+        os.replace(tmp_path, cached_lock)
+        logging.info(f"Memoized lock file: {cached_lock}")
+    except OSError as e:
+        logging.error(f"Error memoizing lock file: {str(e)}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def sync_pubspec_dependencies(project_path, app_name, flutter_sdk_path):
+    """Updates pubspec.yaml from the generated imports and resolves them offline.
+
+    Returns the list of packages added to pubspec.yaml.
+    """
+    packages = scan_package_imports(project_path, app_name)
+    added = update_pubspec(project_path, packages)
+    resolve_dependencies(project_path, packages, flutter_sdk_path)
+    return added
+
+WARMUP_APP_NAME = "fabs_pub_cache_warmup"
+
+def _online_pub_get(project_path, flutter_sdk_path):
+    try:
+        subprocess.run([_flutter(flutter_sdk_path), "pub", "get"], cwd=project_path, env=_pub_env(),
+                       check=True, capture_output=True, text=True, timeout=PROCESS_TIMEOUT)
+        return True
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        logging.error(f"Error resolving {project_path} online: {str(e)}")
+        return False
+
+def warm_pub_cache(flutter_sdk_path, packages=COMMON_PACKAGES):
+    """Fills the shared pub cache with packages and everything they depend on.
+
+    An online `flutter pub get` is run on a scratch `flutter create` project that
+    depends on packages, so the cache also holds their dependencies, the template's
+    own dependencies and the hosted packages pinned by the Flutter SDK. Needs network
+    access; run it outside the build path. Returns the list of packages that could
+    not be resolved.
+    """
+    os.makedirs(PUB_CACHE_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        try:
+            subprocess.run([_flutter(flutter_sdk_path), "create", "--no-pub", WARMUP_APP_NAME], cwd=scratch_dir,
+                           env=_pub_env(), check=True, capture_output=True, text=True, timeout=PROCESS_TIMEOUT)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logging.error(f"Error creating pub cache warm-up project: {str(e)}")
+            return list(packages)
+        project_path = os.path.join(scratch_dir, WARMUP_APP_NAME)
+        pubspec_path = os.path.join(project_path, "pubspec.yaml")
+        with open(pubspec_path, "r", encoding="utf-8") as f:
+            template = f.read()
+
+        update_pubspec(project_path, packages)
+        if _online_pub_get(project_path, flutter_sdk_path):
+            logging.info(f"Pub cache warmed in {PUB_CACHE_DIR}")
+            return []
+
+        # Some packages cannot be resolved together; warm each one on its own instead
+        failed = []
+        for package in packages:
+            with open(pubspec_path, "w", encoding="utf-8") as f:
+                f.write(template)
+            update_pubspec(project_path, [package])
+            if not _online_pub_get(project_path, flutter_sdk_path):
+                failed.append(package)
+    logging.info(f"Pub cache warmed in {PUB_CACHE_DIR}")
+    return failed
@@ -0,0 +1,212 @@
+"""Per-job build workspaces.
+
+Every build gets its own uniquely named directory under a shared root, so
+concurrent builds of the same app never touch each other's files. Finished
+workspaces are renamed out of the way immediately and deleted by a
+background reaper thread, which also sweeps directories left behind by
+crashed or abandoned builds.
+"""
+import logging
+import os
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+
+
+WORKSPACE_ROOT = "flutter_workspaces"
+TMPFS_ROOT = "/dev/shm"
+WORKSPACE_QUOTA = 5 * 1024 * 1024 * 1024  # Total bytes allowed under the workspace root
+ORPHAN_MAX_AGE = 6 * 60 * 60              # Workspaces older than this are considered abandoned
+REAPER_INTERVAL = 10 * 60                 # Seconds between periodic orphan sweeps
+
+# Every directory the manager creates under root carries one of these prefixes; nothing else is touched
+JOB_PREFIX = "fabs-job-"
+TRASH_PREFIX = ".fabs-trash-"
+OWNER_FILE = ".fabs-owner"  # "<hostname> <pid>" of the process that created the workspace
+
+
+def _owner_is_dead(path):
+    """Returns True if the workspace's owner file names a process on this host that has exited."""
+    try:
+        with open(os.path.join(path, OWNER_FILE), "r") as f:
+            host, pid = f.read().split()
+        pid = int(pid)
+    except (OSError, ValueError):
+        return False
+    # Other hosts' processes cannot be checked, and os.kill(pid, 0) sends CTRL_C_EVENT on Windows
+    if host != socket.gethostname() or pid == os.getpid() or os.name == "nt":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # Exists but belongs to another user
+    return False
+
+def _directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                pass  # Removed by a concurrent cleanup
+    return total
+
+class WorkspaceManager:
+    """Hands out unique job directories under root and cleans them up in the background."""
+
+    def __init__(self, root=WORKSPACE_ROOT, quota=WORKSPACE_QUOTA, use_tmpfs=False, orphan_max_age=ORPHAN_MAX_AGE,
+                 reaper_interval=REAPER_INTERVAL):
+        if use_tmpfs:
+            if os.path.isdir(TMPFS_ROOT):
+                root = os.path.join(TMPFS_ROOT, os.path.basename(os.path.normpath(root)))
+            else:
+                logging.warning(f"tmpfs not available at {TMPFS_ROOT}, using {root}")
+        self.root = os.path.abspath(root)
+        self.quota = quota
+        self.orphan_max_age = orphan_max_age
+        self.reaper_interval = reaper_interval
+        self._active = set()
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._queued = set()
+        self._last_sweep = time.monotonic()
+        self._closed = threading.Event()
+        os.makedirs(self.root, exist_ok=True)
+
+        self.sweep_orphans()
+        self._reaper = threading.Thread(target=self._reap, name="workspace-reaper", daemon=True)
+        self._reaper.start()
+
+    def close(self, timeout=None):
+        """Stops the reaper thread after it has deleted every workspace already scheduled."""
+        self._closed.set()
+        self._pending.put(None)  # Wakes the reaper; it runs after everything queued before it
+        self._reaper.join(timeout)
+
+    def disk_usage(self):
+        """Returns the bytes used by this manager's workspaces, including pending deletions."""
+        return sum(_directory_size(path) for path in self._owned_entries())
+
+    def check_quota(self):
+        """Raises RuntimeError if the workspaces have reached their disk quota.
+
+        The quota is a soft limit checked only when a job is admitted: no space is
+        reserved, so jobs admitted together can each grow past it by one project.
+        Call this before any expensive work that precedes acquire().
+        """
+        usage = self.disk_usage()
+        if usage >= self.quota:
+            logging.error(f"Workspace quota exceeded: {usage} of {self.quota} bytes used in {self.root}")
+            raise RuntimeError("Build workspace disk quota exceeded. Please try again in a few minutes.")
+
+    def acquire(self, app_name):
+        """Creates and returns a new directory for one build job, holding only its owner file."""
+        self.check_quota()
+        path = tempfile.mkdtemp(prefix=f"{JOB_PREFIX}{app_name}_", dir=self.root)
+        with open(os.path.join(path, OWNER_FILE), "w") as f:
+            f.write(f"{socket.gethostname()} {os.getpid()}")
+        with self._lock:
+            self._active.add(path)
+        logging.info(f"Created workspace: {path}")
+        return path
+
+    def release(self, path):
+        """Schedules a workspace for deletion without blocking the caller."""
+        with self._lock:
+            self._active.discard(path)
+        self._discard(path)
+
+    @contextmanager
+    def job(self, app_name):
+        """Yields a fresh workspace directory and releases it when the block exits, even on failure."""
+        path = self.acquire(app_name)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def sweep_orphans(self):
+        """Schedules deletion of leftover trash and abandoned workspaces. Returns the number found.
+
+        A workspace is abandoned once its owning process has exited or, when that
+        cannot be determined, once it is older than orphan_max_age.
+        """
+        self._last_sweep = time.monotonic()
+        with self._lock:
+            active = set(self._active) | self._queued
+        now = time.time()
+        count = 0
+        for path in self._owned_entries():
+            if path in active:
+                continue
+            try:
+                age = now - os.lstat(path).st_mtime
+            except OSError:
+                continue
+            if os.path.basename(path).startswith(TRASH_PREFIX) or age > self.orphan_max_age or _owner_is_dead(path):
+                self._discard(path)
+                count += 1
+        if count:
+            logging.info(f"Scheduled {count} orphaned workspace(s) in {self.root} for cleanup")
+        return count
+
+    def _owned_entries(self):
+        # Only directories this manager could have created, so a root shared with
+        # other files (e.g. /tmp) is never swept or counted against the quota
+        return [
+            entry.path for entry in os.scandir(self.root)
+            if entry.name.startswith((JOB_PREFIX, TRASH_PREFIX)) and entry.is_dir(follow_symlinks=False)
+        ]
+
+    def _discard(self, path):
+        # Renaming is atomic and cheap, so the directory disappears from view immediately
+        # and a new job can never be handed the same path while it is being deleted.
+        name = os.path.basename(path)
+        if not name.startswith(TRASH_PREFIX):
+            trash = os.path.join(self.root, f"{TRASH_PREFIX}{uuid.uuid4().hex}")
+            try:
+                os.rename(path, trash)
+                path = trash
+            except OSError as e:
+                logging.warning(f"Could not move workspace {path} to trash: {str(e)}")
+        with self._lock:
+            if path in self._queued:
+                return
+            self._queued.add(path)
+        self._pending.put(path)
+
+    def _reap(self):
+        while not self._closed.is_set():
+            # Sweep on schedule even when the queue never drains, which is when orphans pile up
+            if time.monotonic() - self._last_sweep >= self.reaper_interval:
+                try:
+                    self.sweep_orphans()
+                except Exception as e:
+                    logging.error(f"Error sweeping orphaned workspaces: {str(e)}")
+            try:
+                path = self._pending.get(timeout=max(0, self.reaper_interval - (time.monotonic() - self._last_sweep)))
+            except queue.Empty:
+                continue
+            if path is None:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            with self._lock:
+                self._queued.discard(path)
+            if os.path.exists(path):
+                logging.error(f"Error removing workspace: {path}")
+            else:
+                logging.info(f"Removed workspace: {path}")
+
+@lru_cache(maxsize=None)
+def get_workspace_manager(root=WORKSPACE_ROOT, quota=WORKSPACE_QUOTA, use_tmpfs=False):
+    """Returns the shared WorkspaceManager for these settings, creating it (and sweeping orphans) on first use."""
+    return WorkspaceManager(root=root, quota=quota, use_tmpfs=use_tmpfs)
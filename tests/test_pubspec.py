@@ -0,0 +1,199 @@
+import os
+import shutil
+import stat
+import threading
+
+import pytest
+
+from fabs import pubspec
+
+
+# Trimmed pubspec.yaml as written by `flutter create`
+FLUTTER_CREATE_PUBSPEC = """\
+name: my_flutter_app
+description: "A new Flutter project."
+publish_to: 'none'
+version: 1.0.0+1
+
+environment:
+  sdk: ^3.5.0
+
+dependencies:
+  flutter:
+    sdk: flutter
+
+  # The following adds the Cupertino Icons font to your application.
+  cupertino_icons: ^1.0.8
+
+dev_dependencies:
+  flutter_test:
+    sdk: flutter
+
+  flutter_lints: ^4.0.0
+
+flutter:
+  uses-material-design: true
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    project_path = tmp_path / "my_flutter_app"
+    (project_path / "lib").mkdir(parents=True)
+    (project_path / "pubspec.yaml").write_text(FLUTTER_CREATE_PUBSPEC)
+    return project_path
+
+
+# Stub `flutter`: `create` writes a template pubspec.yaml, `pub ...` records the call
+# (arguments, PUB_CACHE and the pubspec it saw) to FLUTTER_STUB_LOG and writes a pubspec.lock.
+# A pubspec.lock containing "stale" makes `pub` fail.
+STUB_FLUTTER = """\
+#!/bin/sh
+case "$1" in
+  create)
+    for name; do :; done
+    mkdir -p "$name"
+    cat > "$name/pubspec.yaml" <<'PUBSPEC'
+%s
+PUBSPEC
+    ;;
+  pub)
+    if grep -q stale pubspec.lock 2>/dev/null; then echo "lock file does not resolve" >&2; exit 1; fi
+    { echo "$* PUB_CACHE=$PUB_CACHE"; cat pubspec.yaml; } >> "${FLUTTER_STUB_LOG:-/dev/null}"
+    echo 'packages: {}' > pubspec.lock
+    ;;
+esac
+""" % FLUTTER_CREATE_PUBSPEC.rstrip("\n")
+
+
+@pytest.fixture
+def flutter_sdk(tmp_path, monkeypatch):
+    """A stub Flutter SDK; see STUB_FLUTTER."""
+    if os.name == "nt":
+        pytest.skip("stub flutter script requires a POSIX shell")
+    bin_dir = tmp_path / "flutter" / "bin"
+    bin_dir.mkdir(parents=True)
+    script = bin_dir / "flutter"
+    script.write_text(STUB_FLUTTER)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("FLUTTER_STUB_LOG", str(tmp_path / "flutter.log"))
+    return str(tmp_path / "flutter")
+
+
+@pytest.fixture
+def lock_cache(tmp_path, monkeypatch):
+    lock_cache_dir = tmp_path / "locks"
+    monkeypatch.setattr(pubspec, "LOCK_CACHE_DIR", str(lock_cache_dir))
+    monkeypatch.setattr(pubspec, "PUB_CACHE_DIR", str(tmp_path / "pub_cache"))
+    return lock_cache_dir
+
+
+def test_scan_package_imports_skips_sdk_and_own_packages(project):
+    (project / "lib" / "main.dart").write_text(
+        "import 'package:flutter/material.dart';\n"
+        'import "package:provider/provider.dart";\n'
+        "import 'package:my_flutter_app/screens_widgets.dart';\n"
+        "export 'package:http/http.dart' show get;\n"
+        "import 'dart:async';\n"
+    )
+    (project / "lib" / "database.dart").write_text("import 'package:hive/hive.dart';\n")
+
+    assert pubspec.scan_package_imports(str(project), "my_flutter_app") == ["hive", "http", "provider"]
+
+
+def test_update_pubspec_adds_missing_packages_to_dependencies(project):
+    added = pubspec.update_pubspec(str(project), ["cupertino_icons", "flutter_lints", "http", "provider"])
+
+    assert added == ["http", "provider"]
+    content = (project / "pubspec.yaml").read_text()
+    assert "  cupertino_icons: ^1.0.8\n  http: any\n  provider: any\n\ndev_dependencies:" in content
+    assert content.count("flutter_lints") == 1
+    assert pubspec.update_pubspec(str(project), ["http", "provider"]) == []
+
+
+def test_update_pubspec_respects_dependency_overrides(project):
+    with open(project / "pubspec.yaml", "a") as f:
+        f.write("\ndependency_overrides:\n  http: ^1.2.0\n")
+
+    assert pubspec.update_pubspec(str(project), ["http"]) == []
+
+
+def test_update_pubspec_matches_headers_with_comments(project):
+    content = (project / "pubspec.yaml").read_text()
+    content = content.replace("dependencies:\n  flutter:", "dependencies:   # app packages\n  flutter:")
+    content = content.replace("dev_dependencies:\n", "dev_dependencies: \n")
+    (project / "pubspec.yaml").write_text(content)
+
+    assert pubspec.update_pubspec(str(project), ["flutter_lints", "provider"]) == ["provider"]
+    content = (project / "pubspec.yaml").read_text()
+    assert content.count("dependencies:") == 2
+    assert "  cupertino_icons: ^1.0.8\n  provider: any\n" in content
+
+
+def test_resolve_dependencies_memoizes_lock(project, flutter_sdk, lock_cache):
+    pubspec.resolve_dependencies(str(project), ["provider"], flutter_sdk)
+
+    assert [f for f in os.listdir(lock_cache) if f.endswith(".lock")] == \
+        [f"{pubspec.get_dependency_set_key(['provider'], flutter_sdk)}.lock"]
+
+
+def test_resolve_dependencies_replaces_stale_memoized_lock(project, flutter_sdk, lock_cache):
+    lock_cache.mkdir()
+    cached_lock = lock_cache / f"{pubspec.get_dependency_set_key(['provider'], flutter_sdk)}.lock"
+    cached_lock.write_text("stale\n")
+
+    pubspec.resolve_dependencies(str(project), ["provider"], flutter_sdk)
+
+    assert cached_lock.read_text() == "packages: {}\n"
+    assert (project / "pubspec.lock").read_text() == "packages: {}\n"
+
+
+def test_dependency_set_key_includes_sdk_version(flutter_sdk):
+    before = pubspec.get_dependency_set_key(["provider"], flutter_sdk)
+    with open(os.path.join(flutter_sdk, "version"), "w") as f:
+        f.write("3.24.0\n")
+
+    assert pubspec.get_dependency_set_key(["provider"], flutter_sdk) != before
+
+
+def test_resolve_dependencies_concurrent_builds(tmp_path, flutter_sdk, lock_cache):
+    errors = []
+
+    def build(project_path):
+        project_path.mkdir()
+        try:
+            pubspec.resolve_dependencies(str(project_path), ["provider"], flutter_sdk)
+        except Exception as e:
+            errors.append(e)
+
+    # Every round starts with an empty lock cache so all builds race to memoize the same lock
+    for round_number in range(10):
+        shutil.rmtree(lock_cache, ignore_errors=True)
+        threads = [threading.Thread(target=build, args=(tmp_path / f"job_{round_number}_{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert all(f.endswith(".lock") for f in os.listdir(lock_cache))
+
+
+def test_resolve_dependencies_ignores_memoization_errors(project, flutter_sdk, tmp_path, monkeypatch):
+    # A file where the lock cache directory should be makes every memoization attempt fail
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    monkeypatch.setattr(pubspec, "LOCK_CACHE_DIR", str(blocker / "locks"))
+
+    pubspec.resolve_dependencies(str(project), ["provider"], flutter_sdk)
+
+    assert (project / "pubspec.lock").exists()
+
+
+def test_warm_pub_cache_resolves_all_packages_online(tmp_path, flutter_sdk, lock_cache):
+    assert pubspec.warm_pub_cache(flutter_sdk, ["provider", "flutter_bloc"]) == []
+
+    log = (tmp_path / "flutter.log").read_text()
+    assert log.startswith(f"pub get PUB_CACHE={pubspec.PUB_CACHE_DIR}\n")
+    assert "--offline" not in log
+    assert "  provider: any\n  flutter_bloc: any\n" in log
@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only; importing fabs must never pull these in
+HEAVY_MODULES = ["openai", "swarm", "tqdm", "streamlit", "pandas", "numpy"]
+
+
+def test_import_fabs_does_not_load_heavy_dependencies():
+    code = (
+        "import json, sys\n"
+        "import fabs\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+    assert json.loads(result.stdout) == []
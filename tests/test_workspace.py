@@ -0,0 +1,171 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from fabs.workspace import JOB_PREFIX, OWNER_FILE, TRASH_PREFIX, WorkspaceManager
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def make_old_dir(path, age=7 * 60 * 60):
+    os.makedirs(path)
+    old = time.time() - age
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / "workspaces")
+
+
+@pytest.fixture
+def make_manager():
+    """Creates WorkspaceManagers and stops their reaper threads after the test."""
+    managers = []
+
+    def factory(**kwargs):
+        manager = WorkspaceManager(**kwargs)
+        managers.append(manager)
+        return manager
+
+    yield factory
+    for manager in managers:
+        manager.close(timeout=5)
+        assert not manager._reaper.is_alive()
+
+
+def test_concurrent_jobs_get_unique_workspaces(root, make_manager):
+    manager = make_manager(root=root)
+    paths = []
+    errors = []
+
+    def build():
+        try:
+            with manager.job("my_flutter_app") as path:
+                paths.append(path)
+                with open(os.path.join(path, "main.dart"), "w") as f:
+                    f.write(path)
+                time.sleep(0.05)
+                with open(os.path.join(path, "main.dart")) as f:
+                    assert f.read() == path
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=build) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(paths)) == 8
+    assert wait_for(lambda: os.listdir(root) == [])
+
+
+def test_job_releases_workspace_on_failure(root, make_manager):
+    manager = make_manager(root=root)
+
+    with pytest.raises(ValueError):
+        with manager.job("my_flutter_app") as path:
+            raise ValueError("build failed")
+
+    assert not os.path.exists(path)
+    assert wait_for(lambda: os.listdir(root) == [])
+
+
+def test_startup_sweep_only_removes_own_entries(root, make_manager):
+    unrelated = make_old_dir(os.path.join(root, "unrelated_dir"))
+    orphan = make_old_dir(os.path.join(root, f"{JOB_PREFIX}my_flutter_app_abc"))
+    trash = os.path.join(root, f"{TRASH_PREFIX}leftover")
+    os.makedirs(trash)
+    recent = os.path.join(root, f"{JOB_PREFIX}my_flutter_app_def")
+    os.makedirs(recent)
+
+    make_manager(root=root)
+
+    assert wait_for(lambda: not os.path.exists(orphan) and not os.path.exists(trash))
+    assert os.path.isdir(unrelated)
+    assert os.path.isdir(recent)
+
+
+def make_owned_dir(path, pid):
+    os.makedirs(path)
+    with open(os.path.join(path, OWNER_FILE), "w") as f:
+        f.write(f"{socket.gethostname()} {pid}")
+    return path
+
+
+@pytest.mark.skipif(os.name == "nt", reason="owner liveness is only checked on POSIX")
+def test_startup_sweep_removes_workspaces_of_dead_processes(root, make_manager):
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    running = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        crashed = make_owned_dir(os.path.join(root, f"{JOB_PREFIX}my_flutter_app_dead"), finished.pid)
+        alive = make_owned_dir(os.path.join(root, f"{JOB_PREFIX}my_flutter_app_live"), running.pid)
+
+        make_manager(root=root)
+
+        assert wait_for(lambda: not os.path.exists(crashed))
+        assert os.path.isdir(alive)
+    finally:
+        running.kill()
+        running.wait()
+
+
+def test_periodic_sweep_runs_under_steady_load(root, make_manager):
+    manager = make_manager(root=root, reaper_interval=0.2)
+    orphan = make_old_dir(os.path.join(root, f"{JOB_PREFIX}abandoned_xyz"))
+
+    # Keep the reaper queue busy so it never sits idle for a whole interval
+    deadline = time.monotonic() + 2
+    while os.path.exists(orphan) and time.monotonic() < deadline:
+        with manager.job("my_flutter_app"):
+            time.sleep(0.01)
+
+    assert not os.path.exists(orphan)
+
+
+def test_quota_ignores_unrelated_files(root, make_manager):
+    manager = make_manager(root=root, quota=1000)
+    with open(os.path.join(root, "unrelated.bin"), "wb") as f:
+        f.write(b"x" * 5000)
+
+    manager.check_quota()
+
+    path = manager.acquire("my_flutter_app")
+    with open(os.path.join(path, "main.dart"), "wb") as f:
+        f.write(b"x" * 5000)
+
+    with pytest.raises(RuntimeError):
+        manager.check_quota()
+    with pytest.raises(RuntimeError):
+        manager.acquire("my_flutter_app")
+
+    manager.release(path)
+    assert wait_for(lambda: manager.disk_usage() == 0)
+    manager.check_quota()
+
+
+def test_close_finishes_scheduled_cleanup(root):
+    manager = WorkspaceManager(root=root)
+    path = manager.acquire("my_flutter_app")
+    manager.release(path)
+
+    manager.close(timeout=5)
+
+    assert not manager._reaper.is_alive()
+    assert os.listdir(root) == []